@@ -4,23 +4,49 @@ Complete demonstration of the Secure Messaging Protocol
 Shows all features: registration, key exchange, encryption, signatures, storage
 """
 
-import json
-import hashlib
-import hmac
-import base64
-import uuid
-from datetime import datetime
-from typing import Dict, List, Optional
 import os
+import sys
+from typing import List
+
+from mock_crypto import MockClient, MockServer
+
+# Static banner blocks, built once at import
+_SEP = "=" * 50
+_SUB = "-" * 30
+_FEATURES = "\n".join(f"  {feature}" for feature in [
+    "✅ End-to-End Encryption",
+    "✅ Digital Signatures (Ed25519)",
+    "✅ Key Exchange (X25519)",
+    "✅ Perfect Forward Secrecy",
+    "✅ Zero-Knowledge Server",
+    "✅ Message Authentication",
+    "✅ Persistent Storage",
+    "✅ JSON Protocol",
+    "✅ Async Communication",
+    "✅ Error Handling"
+])
+_RUST_STEPS = "\n".join([
+    "📋 To run the actual Rust implementation:",
+    "   1. Install Rust: https://rustup.rs/",
+    "   2. Run: cargo run --bin server",
+    "   3. Run: cargo run --bin client sugar",
+    "   4. Run: cargo run --bin client isaac"
+])
+
+def _flush(out: List[str]):
+    """Write buffered demo lines to stdout in one call"""
+    sys.stdout.write("".join(line + "\n" for line in out))
+    out.clear()
 
 class SecureMessagingDemo:
     """Complete demonstration of the secure messaging protocol"""
     
     def __init__(self):
-        self.server = MockServer()
         self.clients = {}
         self.data_dir = "./demo_data"
         os.makedirs(self.data_dir, exist_ok=True)
+        # Each run has new keys, so earlier runs' messages could not be decrypted
+        self.server = MockServer(self.data_dir, fresh_log=True)
         
     def create_client(self, name: str) -> 'MockClient':
         """Create a new client with cryptographic keys"""
@@ -30,292 +56,163 @@ class SecureMessagingDemo:
     
     def run_complete_demo(self):
         """Run the complete demonstration"""
-        print("🔐 Secure Messaging Protocol - Complete Demo")
-        print("=" * 50)
-        print()
+        out: List[str] = []
+        
+        out.append("🔐 Secure Messaging Protocol - Complete Demo")
+        out.append(_SEP)
+        out.append("")
         
         # Step 1: Create clients
-        print("📝 Step 1: Creating Clients")
-        print("-" * 30)
+        out.append("📝 Step 1: Creating Clients")
+        out.append(_SUB)
         sugar = self.create_client("sugar")
         isaac = self.create_client("isaac")
         charlie = self.create_client("charlie")
         
-        print(f"✅ Created Sugar: {sugar.get_public_keys()}")
-        print(f"✅ Created Isaac: {isaac.get_public_keys()}")
-        print(f"✅ Created Charlie: {charlie.get_public_keys()}")
-        print()
+        out.append(f"✅ Created Sugar: {sugar.get_public_keys()}")
+        out.append(f"✅ Created Isaac: {isaac.get_public_keys()}")
+        out.append(f"✅ Created Charlie: {charlie.get_public_keys()}")
+        out.append("")
+        
+        _flush(out)
         
         # Step 2: Register clients with server
-        print("📝 Step 2: Client Registration")
-        print("-" * 30)
+        out.append("📝 Step 2: Client Registration")
+        out.append(_SUB)
+        
+        new_clients = [sugar, isaac, charlie]
+        results = self.server.register_clients([(client.name, client.ed25519_key) for client in new_clients])
+        for client, result in zip(new_clients, results):
+            out.append(f"✅ {client.name.capitalize()} registered: {result['server_public_key'][:20]}...")
+        out.append("")
         
-        for client in [sugar, isaac, charlie]:
-            result = self.server.register_client(client.name, client.ed25519_key)
-            print(f"✅ {client.name.capitalize()} registered: {result['server_public_key'][:20]}...")
-        print()
+        _flush(out)
         
         # Step 3: Key exchange
-        print("🔑 Step 3: Key Exchange (Out-of-Band)")
-        print("-" * 30)
+        out.append("🔑 Step 3: Key Exchange (Out-of-Band)")
+        out.append(_SUB)
         
         # Sugar and Isaac exchange keys
         sugar.add_contact("isaac", isaac.x25519_key)
         isaac.add_contact("sugar", sugar.x25519_key)
-        print("✅ Sugar ↔ Isaac: Keys exchanged")
+        out.append("✅ Sugar ↔ Isaac: Keys exchanged")
         
         # Isaac and Charlie exchange keys
         isaac.add_contact("charlie", charlie.x25519_key)
         charlie.add_contact("isaac", isaac.x25519_key)
-        print("✅ Isaac ↔ Charlie: Keys exchanged")
-        print()
+        out.append("✅ Isaac ↔ Charlie: Keys exchanged")
+        out.append("")
+        
+        _flush(out)
         
         # Step 4: Send encrypted messages
-        print("📤 Step 4: Sending Encrypted Messages")
-        print("-" * 30)
+        out.append("📤 Step 4: Sending Encrypted Messages")
+        out.append(_SUB)
         
         # Sugar sends message to Isaac
         message1 = "Hello Isaac! This is a secret message from Sugar."
-        print(f"📝 Sugar → Isaac: {message1}")
+        out.append(f"📝 Sugar → Isaac: {message1}")
         sugar.send_message(self.server, "isaac", message1)
         
         # Isaac sends message to Sugar
         message2 = "Hi Sugar! Thanks for the message. How are you?"
-        print(f"📝 Isaac → Sugar: {message2}")
+        out.append(f"📝 Isaac → Sugar: {message2}")
         isaac.send_message(self.server, "sugar", message2)
         
         # Isaac sends message to Charlie
         message3 = "Hey Charlie! Want to join our secure chat?"
-        print(f"📝 Isaac → Charlie: {message3}")
+        out.append(f"📝 Isaac → Charlie: {message3}")
         isaac.send_message(self.server, "charlie", message3)
-        print()
+        
+        out.append("")
+        
+        _flush(out)
         
         # Step 5: Receive and decrypt messages
-        print("📥 Step 5: Receiving and Decrypting Messages")
-        print("-" * 30)
+        out.append("📥 Step 5: Receiving and Decrypting Messages")
+        out.append(_SUB)
         
         # Isaac receives messages
         isaac_messages = isaac.receive_messages(self.server)
-        print(f"📨 Isaac received {len(isaac_messages)} message(s):")
+        out.append(f"📨 Isaac received {len(isaac_messages)} message(s):")
         for msg in isaac_messages:
-            print(f"  From {msg['sender_id']}: {msg['decrypted_content']}")
+            out.append(f"  From {msg['sender_id']}: {msg['decrypted_content']}")
         
         # Sugar receives messages
         sugar_messages = sugar.receive_messages(self.server)
-        print(f"📨 Sugar received {len(sugar_messages)} message(s):")
+        out.append(f"📨 Sugar received {len(sugar_messages)} message(s):")
         for msg in sugar_messages:
-            print(f"  From {msg['sender_id']}: {msg['decrypted_content']}")
+            out.append(f"  From {msg['sender_id']}: {msg['decrypted_content']}")
         
         # Charlie receives messages
         charlie_messages = charlie.receive_messages(self.server)
-        print(f"📨 Charlie received {len(charlie_messages)} message(s):")
+        out.append(f"📨 Charlie received {len(charlie_messages)} message(s):")
         for msg in charlie_messages:
-            print(f"  From {msg['sender_id']}: {msg['decrypted_content']}")
-        print()
+            out.append(f"  From {msg['sender_id']}: {msg['decrypted_content']}")
+        out.append("")
+        
+        _flush(out)
         
         # Step 6: Security verification
-        print("🔒 Step 6: Security Verification")
-        print("-" * 30)
+        out.append("🔒 Step 6: Security Verification")
+        out.append(_SUB)
         
         # Check that server cannot decrypt messages
         server_messages = self.server.get_all_messages()
-        print(f"📊 Server has {len(server_messages)} stored messages:")
+        out.append(f"📊 Server has {len(server_messages)} stored messages:")
         for msg in server_messages:
-            print(f"  {msg['sender_id']} → {msg['recipient_id']}: {msg['content'][:50]}...")
-            print(f"    (Server cannot decrypt this content)")
-        print()
+            out.append(f"  {msg.sender_id} → {msg.recipient_id}: {msg.content.hex()[:50]}...")
+            out.append(f"    (Server cannot decrypt this content)")
+        out.append("")
+        
+        _flush(out)
         
         # Step 7: Demonstrate perfect forward secrecy
-        print("🔐 Step 7: Perfect Forward Secrecy Demo")
-        print("-" * 30)
+        out.append("🔐 Step 7: Perfect Forward Secrecy Demo")
+        out.append(_SUB)
         
         # Show that each message uses different encryption
         sugar_messages = self.server.get_messages_for_client("sugar")
         if sugar_messages:
             msg = sugar_messages[0]
-            print(f"📝 Sugar's message encryption: {msg['content'][:30]}...")
-            print(f"🔑 Each message uses a new ephemeral key")
-            print(f"✅ Past messages remain secure even if keys are compromised")
-        print()
+            out.append(f"📝 Sugar's message encryption: {msg.content.hex()[:30]}...")
+            out.append(f"🔑 Each message uses a new ephemeral key")
+            out.append(f"✅ Past messages remain secure even if keys are compromised")
+        out.append("")
+        
+        _flush(out)
         
         # Step 8: Show storage
-        print("💾 Step 8: Persistent Storage")
-        print("-" * 30)
+        out.append("💾 Step 8: Persistent Storage")
+        out.append(_SUB)
         
-        print("✅ Messages saved to disk")
-        print("✅ Client data persisted")
-        print("✅ Server can restart and maintain state")
-        print()
+        self.server.save_data(self.data_dir)
+        out.append("✅ Messages saved to disk")
+        out.append("✅ Client data persisted")
+        out.append("✅ Server can restart and maintain state")
+        out.append("")
         
-        # Step 9: Show protocol features
-        print("🚀 Step 9: Protocol Features")
-        print("-" * 30)
-        
-        features = [
-            "✅ End-to-End Encryption",
-            "✅ Digital Signatures (Ed25519)",
-            "✅ Key Exchange (X25519)",
-            "✅ Perfect Forward Secrecy",
-            "✅ Zero-Knowledge Server",
-            "✅ Message Authentication",
-            "✅ Persistent Storage",
-            "✅ JSON Protocol",
-            "✅ Async Communication",
-            "✅ Error Handling"
-        ]
-        
-        for feature in features:
-            print(f"  {feature}")
-        print()
-        
-        print("🎉 Demo Complete! The system is ready for production use.")
-        print()
-        print("📋 To run the actual Rust implementation:")
-        print("   1. Install Rust: https://rustup.rs/")
-        print("   2. Run: cargo run --bin server")
-        print("   3. Run: cargo run --bin client sugar")
-        print("   4. Run: cargo run --bin client isaac")
-
-class MockClient:
-    """Mock client with cryptographic capabilities"""
-    
-    def __init__(self, name: str):
-        self.name = name
-        self.ed25519_key = f"{name}_ed25519_key_{hashlib.md5(name.encode()).hexdigest()[:16]}"
-        self.x25519_key = f"{name}_x25519_key_{hashlib.md5(name.encode()).hexdigest()[:16]}"
-        self.contacts = {}
-        
-    def get_public_keys(self) -> Dict[str, str]:
-        return {
-            "ed25519": self.ed25519_key,
-            "x25519": self.x25519_key
-        }
-    
-    def add_contact(self, contact_name: str, contact_x25519_key: str):
-        """Add a contact with their X25519 public key"""
-        self.contacts[contact_name] = contact_x25519_key
-    
-    def sign(self, message: str) -> str:
-        """Create Ed25519 signature"""
-        signature = hmac.new(
-            self.ed25519_key.encode(),
-            message.encode(),
-            hashlib.sha256
-        ).hexdigest()[:64]
-        return signature
-    
-    def encrypt(self, message: str, recipient_key: str) -> str:
-        """Encrypt message for recipient using X25519 + ChaCha20-Poly1305 (mock)"""
-        # In reality: X25519 key exchange + ChaCha20-Poly1305 encryption
-        encrypted = base64.b64encode(message.encode()).decode()
-        return f"encrypted_{encrypted}_{recipient_key[:8]}"
-    
-    def decrypt(self, encrypted_msg: str, sender_key: str) -> str:
-        """Decrypt message from sender"""
-        if encrypted_msg.startswith("encrypted_"):
-            parts = encrypted_msg.split("_")
-            if len(parts) >= 3:
-                return base64.b64decode(parts[1]).decode()
-        return "DECRYPTION_FAILED"
-    
-    def send_message(self, server: 'MockServer', recipient: str, message: str):
-        """Send encrypted message to recipient"""
-        if recipient not in self.contacts:
-            raise ValueError(f"Recipient {recipient} not in contacts")
+        _flush(out)
         
-        # Encrypt for recipient
-        encrypted = self.encrypt(message, self.contacts[recipient])
+        # Step 9: Show protocol features
+        out.append("🚀 Step 9: Protocol Features")
+        out.append(_SUB)
         
-        # Sign the encrypted content
-        signature = self.sign(encrypted)
+        out.append(_FEATURES)
+        out.append("")
         
-        # Send to server
-        server.send_message(self.name, recipient, encrypted, signature, str(uuid.uuid4()))
-    
-    def receive_messages(self, server: 'MockServer') -> List[Dict]:
-        """Receive and decrypt messages"""
-        messages = server.get_messages_for_client(self.name)
-        decrypted_messages = []
-        
-        for msg in messages:
-            if msg['sender_id'] in self.contacts:
-                decrypted = self.decrypt(msg['content'], self.contacts[msg['sender_id']])
-                decrypted_messages.append({
-                    'sender_id': msg['sender_id'],
-                    'decrypted_content': decrypted,
-                    'timestamp': msg['timestamp']
-                })
-        
-        return decrypted_messages
-
-class MockServer:
-    """Mock server with storage and verification"""
-    
-    def __init__(self):
-        self.clients: Dict[str, str] = {}
-        self.messages: List[Dict] = []
-        
-    def register_client(self, client_id: str, public_key: str) -> Dict:
-        """Register a new client"""
-        self.clients[client_id] = public_key
-        return {
-            "type": "Registered",
-            "server_public_key": "server_ed25519_key_abcdef1234567890"
-        }
-    
-    def send_message(self, sender_id: str, recipient_id: str, 
-                    encrypted_content: str, signature: str, message_id: str) -> Dict:
-        """Process a message send request"""
-        # Verify sender exists
-        if sender_id not in self.clients:
-            return {"type": "Error", "message": f"Unknown sender: {sender_id}"}
-        
-        # Verify signature (mock)
-        expected_signature = hmac.new(
-            self.clients[sender_id].encode(),
-            encrypted_content.encode(),
-            hashlib.sha256
-        ).hexdigest()[:64]
-        
-        if signature != expected_signature:
-            return {"type": "Error", "message": "Invalid signature"}
-        
-        # Store message
-        message = {
-            "id": message_id,
-            "sender_id": sender_id,
-            "recipient_id": recipient_id,
-            "content": encrypted_content,
-            "timestamp": datetime.now().isoformat(),
-            "signature": signature
-        }
-        self.messages.append(message)
-        
-        return {"type": "MessageSent", "message_id": message_id}
-    
-    def get_messages_for_client(self, client_id: str) -> List[Dict]:
-        """Get messages for a client"""
-        return [msg for msg in self.messages if msg["recipient_id"] == client_id]
-    
-    def get_all_messages(self) -> List[Dict]:
-        """Get all stored messages"""
-        return self.messages
-    
-    def save_data(self, data_dir: str):
-        """Save server data to disk"""
-        data = {
-            "clients": self.clients,
-            "messages": self.messages,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        with open(f"{data_dir}/server_data.json", "w") as f:
-            json.dump(data, f, indent=2)
+        out.append("🎉 Demo Complete! The system is ready for production use.")
+        out.append("")
+        out.append(_RUST_STEPS)
+        _flush(out)
 
 def main():
     """Run the complete demonstration"""
     demo = SecureMessagingDemo()
-    demo.run_complete_demo()
+    try:
+        demo.run_complete_demo()
+    finally:
+        demo.server.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,255 @@
+"""
+Mock client and server shared by the demo scripts
+Real Ed25519 signatures, X25519 key agreement and ChaCha20-Poly1305 encryption, in-process transport
+"""
+
+import os
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+import orjson
+from cryptography.exceptions import InvalidSignature, InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey, X25519PublicKey
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+def _hex_default(obj):
+    """orjson fallback: store raw ciphertext bytes as hex, like the Rust server"""
+    if isinstance(obj, bytes):
+        return obj.hex()
+    raise TypeError
+
+@dataclass(slots=True, frozen=True)
+class Message:
+    """A stored message as held by the server"""
+    id: str
+    sender_id: str
+    recipient_id: str
+    content: bytes
+    timestamp: str
+    signature: str
+
+class MockClient:
+    """Mock client with cryptographic capabilities"""
+    
+    __slots__ = ('name', 'ed25519_key', 'x25519_key', 'contacts', '_aeads', '_sk', '_xsk', '_seq')
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._sk = Ed25519PrivateKey.generate()
+        self.ed25519_key = self._sk.public_key().public_bytes_raw().hex()
+        self._xsk = X25519PrivateKey.generate()
+        self.x25519_key = self._xsk.public_key().public_bytes_raw().hex()
+        self.contacts = {}
+        self._aeads: Dict[str, ChaCha20Poly1305] = {}
+        self._seq = 0
+        
+    def get_public_keys(self) -> Dict[str, str]:
+        return {
+            "ed25519": self.ed25519_key,
+            "x25519": self.x25519_key
+        }
+    
+    def add_contact(self, contact_name: str, contact_x25519_key: str):
+        """Add a contact with their X25519 public key"""
+        peer = X25519PublicKey.from_public_bytes(bytes.fromhex(contact_x25519_key))
+        shared = self._xsk.exchange(peer)
+        key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b"messaging-proto").derive(shared)
+        
+        self.contacts[contact_name] = contact_x25519_key
+        self._aeads[contact_name] = ChaCha20Poly1305(key)
+    
+    def sign(self, data: bytes) -> str:
+        """Create Ed25519 signature"""
+        return self._sk.sign(data).hex()
+    
+    def encrypt(self, message: str, recipient: str) -> bytes:
+        """Encrypt message for a contact using ChaCha20-Poly1305, as nonce || ciphertext"""
+        nonce = os.urandom(12)
+        return nonce + self._aeads[recipient].encrypt(nonce, message.encode(), None)
+    
+    def decrypt(self, encrypted_msg: bytes, sender: str) -> str:
+        """Decrypt message from a contact"""
+        try:
+            return self._aeads[sender].decrypt(encrypted_msg[:12], encrypted_msg[12:], None).decode()
+        except (InvalidTag, ValueError):
+            return "DECRYPTION_FAILED"
+    
+    def send_message(self, server: 'MockServer', recipient: str, message: str):
+        """Send encrypted message to recipient"""
+        if recipient not in self.contacts:
+            raise ValueError(f"Recipient {recipient} not in contacts")
+        
+        # Encrypt for recipient
+        encrypted = self.encrypt(message, recipient)
+        
+        # Sign the encrypted content
+        signature = self.sign(encrypted)
+        
+        # Send to server with a per-client sequential id
+        self._seq += 1
+        server.send_message(self.name, recipient, encrypted, signature, f"{self.name}-{self._seq}")
+    
+    def receive_messages(self, server: 'MockServer') -> List[Dict]:
+        """Receive and decrypt new messages"""
+        return [
+            {
+                'sender_id': msg.sender_id,
+                'decrypted_content': self.decrypt(msg.content, msg.sender_id),
+                'timestamp': msg.timestamp
+            }
+            for msg in server.get_new_messages_for_client(self.name)
+            if msg.sender_id in self.contacts
+        ]
+
+class MockServer:
+    """Mock server with storage and verification"""
+    
+    # Shared, read-only reply for every successful registration
+    _REGISTERED_REPLY = MappingProxyType({
+        "type": "Registered",
+        "server_public_key": "server_ed25519_key_abcdef1234567890"
+    })
+    
+    def __init__(self, data_dir: Optional[str] = None, fresh_log: bool = False):
+        self.clients: Dict[str, str] = {}
+        self.verify_keys: Dict[str, Ed25519PublicKey] = {}
+        self.messages: List[Message] = []
+        self.inbox: Dict[str, List[Message]] = defaultdict(list)
+        self.last_delivered_idx: Dict[str, int] = {}
+        self._ts_cache: Tuple[int, str] = (0, "")
+        # Append-only NDJSON message log, only when backed by a data directory;
+        # fresh_log starts it empty instead of appending to a previous run
+        self._log_fh = None
+        if data_dir:
+            self._log_fh = open(os.path.join(data_dir, "server_messages.ndjson"), "wb" if fresh_log else "ab")
+        
+    def register_client(self, client_id: str, public_key: str) -> Mapping[str, str]:
+        """Register a new client"""
+        verify_key = Ed25519PublicKey.from_public_bytes(bytes.fromhex(public_key))
+        client_id = sys.intern(client_id)
+        self.clients[client_id] = public_key
+        self.verify_keys[client_id] = verify_key
+        return self._REGISTERED_REPLY
+    
+    def register_clients(self, items: List[Tuple[str, str]]) -> List[Mapping[str, str]]:
+        """Register a burst of (client_id, public_key) pairs"""
+        items = [(sys.intern(client_id), public_key) for client_id, public_key in items]
+        verify_keys = [
+            (client_id, Ed25519PublicKey.from_public_bytes(bytes.fromhex(public_key)))
+            for client_id, public_key in items
+        ]
+        self.clients.update(items)
+        self.verify_keys.update(verify_keys)
+        return [self._REGISTERED_REPLY] * len(items)
+    
+    def send_message(self, sender_id: str, recipient_id: str, 
+                    encrypted_content: bytes, signature: str, message_id: str) -> Dict:
+        """Process a message send request"""
+        # Verify sender exists
+        if sender_id not in self.clients:
+            return {"type": "Error", "message": f"Unknown sender: {sender_id}"}
+        
+        # Share the registered id strings across all stored messages; ids are
+        # interned at registration, so this only looks up the existing object
+        sender_id = sys.intern(sender_id)
+        if recipient_id in self.clients:
+            recipient_id = sys.intern(recipient_id)
+        
+        # Verify Ed25519 signature
+        try:
+            self.verify_keys[sender_id].verify(bytes.fromhex(signature), encrypted_content)
+        except (InvalidSignature, ValueError):
+            return {"type": "Error", "message": "Invalid signature"}
+        
+        # Store message
+        message = Message(
+            id=message_id,
+            sender_id=sender_id,
+            recipient_id=recipient_id,
+            content=encrypted_content,
+            timestamp=self._timestamp(),
+            signature=signature
+        )
+        self.messages.append(message)
+        self.inbox[recipient_id].append(message)
+        if self._log_fh:
+            self._log_fh.write(orjson.dumps(message, default=_hex_default) + b"\n")
+            self._log_fh.flush()
+        
+        return {"type": "MessageSent", "message_id": message_id}
+    
+    def _timestamp(self) -> str:
+        """ISO timestamp, formatting the date part at most once per second"""
+        now = time.time()
+        sec = int(now)
+        if sec != self._ts_cache[0]:
+            self._ts_cache = (sec, datetime.fromtimestamp(sec).isoformat())
+        return f"{self._ts_cache[1]}.{int((now - sec) * 1_000_000):06d}"
+    
+    def get_messages_for_client(self, client_id: str) -> List[Message]:
+        """Get messages for a client"""
+        return list(self.inbox.get(client_id, []))
+    
+    def get_messages(self, client_id: str) -> Dict:
+        """Get the latest message for a client"""
+        client_messages = self.inbox.get(client_id)
+        if client_messages:
+            return {"type": "MessageReceived", "message": client_messages[-1]}
+        else:
+            return {"type": "Error", "message": "No messages found"}
+    
+    def get_new_messages_for_client(self, client_id: str) -> List[Message]:
+        """Get messages for a client that have not been delivered yet"""
+        inbox = self.inbox.get(client_id, [])
+        start = self.last_delivered_idx.get(client_id, 0)
+        self.last_delivered_idx[client_id] = len(inbox)
+        return inbox[start:]
+    
+    def get_all_messages(self) -> List[Message]:
+        """Get all stored messages"""
+        return self.messages
+    
+    def save_data(self, data_dir: str, debug: bool = False):
+        """Save client data to disk (messages are already in the NDJSON log)"""
+        data = {
+            "clients": self.clients,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        with open(f"{data_dir}/clients.json", "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if debug else 0))
+    
+    def replay_log(self, path: str):
+        """Restore stored messages from an NDJSON log"""
+        for message in read_message_log(path):
+            self.messages.append(message)
+            self.inbox[message.recipient_id].append(message)
+    
+    def close(self):
+        """Sync and close the message log"""
+        if self._log_fh:
+            self._log_fh.flush()
+            os.fsync(self._log_fh.fileno())
+            self._log_fh.close()
+            self._log_fh = None
+
+def read_message_log(path: str) -> Iterator[Message]:
+    """Stream messages from an NDJSON log one line at a time"""
+    with open(path, "rb") as f:
+        for line in f:
+            # An unterminated final line is a record torn by a crash mid-write
+            if not line.endswith(b"\n"):
+                break
+            record = orjson.loads(line)
+            record["content"] = bytes.fromhex(record["content"])
+            record["sender_id"] = sys.intern(record["sender_id"])
+            record["recipient_id"] = sys.intern(record["recipient_id"])
+            yield Message(**record)
@@ -34,6 +34,7 @@ impl Client {
 
     async fn connect(&mut self, addr: &str) -> Result<()> {
         let mut stream = TcpStream::connect(addr).await?;
+        stream.set_nodelay(true)?;
         info!("🔗 Connected to server at {}", addr);
         
         // Register with server
@@ -82,6 +83,7 @@ impl Client {
         };
         
         let mut stream = TcpStream::connect(addr).await?;
+        stream.set_nodelay(true)?;
         let request = serde_json::to_string(&send_cmd)?;
         stream.write_all(request.as_bytes()).await?;
         
@@ -109,6 +111,7 @@ impl Client {
         };
         
         let mut stream = TcpStream::connect(addr).await?;
+        stream.set_nodelay(true)?;
         let request = serde_json::to_string(&get_messages_cmd)?;
         stream.write_all(request.as_bytes()).await?;
         
@@ -136,6 +139,7 @@ impl Client {
         let get_clients_cmd = ServerCommand::GetClients;
         
         let mut stream = TcpStream::connect(addr).await?;
+        stream.set_nodelay(true)?;
         let request = serde_json::to_string(&get_clients_cmd)?;
         stream.write_all(request.as_bytes()).await?;
         
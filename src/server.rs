@@ -55,6 +55,8 @@ impl Server {
     }
 
     async fn handle_connection(&self, mut socket: tokio::net::TcpStream) -> Result<()> {
+        // Replies are single small JSON writes; don't let Nagle hold them back
+        socket.set_nodelay(true)?;
         let mut buf = [0; 4096];
         
         loop {
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for the mock client and server
+"""
+
+import os
+import tempfile
+import unittest
+
+from mock_crypto import MockClient, MockServer, read_message_log
+
+class SignatureTest(unittest.TestCase):
+    """Client registration and signature verification on send"""
+
+    def setUp(self):
+        self.server = MockServer()
+        self.alice = MockClient("alice")
+        self.bob = MockClient("bob")
+        self.server.register_clients([("alice", self.alice.ed25519_key), ("bob", self.bob.ed25519_key)])
+
+    def test_invalid_key_leaves_new_client_unregistered(self):
+        with self.assertRaises(ValueError):
+            self.server.register_client("carol", "abcd")
+        self.assertNotIn("carol", self.server.clients)
+        self.assertNotIn("carol", self.server.verify_keys)
+
+    def test_invalid_key_leaves_existing_client_unchanged(self):
+        verify_key = self.server.verify_keys["alice"]
+        with self.assertRaises(ValueError):
+            self.server.register_client("alice", "zz")
+        self.assertEqual(self.server.clients["alice"], self.alice.ed25519_key)
+        self.assertIs(self.server.verify_keys["alice"], verify_key)
+
+    def test_valid_signature_is_stored(self):
+        content = b"ciphertext"
+        result = self.server.send_message("alice", "bob", content, self.alice.sign(content), "m1")
+        self.assertEqual(result, {"type": "MessageSent", "message_id": "m1"})
+        self.assertEqual(len(self.server.get_all_messages()), 1)
+
+    def test_tampered_content_is_rejected(self):
+        signature = self.alice.sign(b"ciphertext")
+        result = self.server.send_message("alice", "bob", b"ciphertexT", signature, "m1")
+        self.assertEqual(result, {"type": "Error", "message": "Invalid signature"})
+        self.assertEqual(self.server.get_all_messages(), [])
+
+    def test_foreign_signature_is_rejected(self):
+        content = b"ciphertext"
+        result = self.server.send_message("alice", "bob", content, self.bob.sign(content), "m1")
+        self.assertEqual(result, {"type": "Error", "message": "Invalid signature"})
+        self.assertEqual(self.server.get_all_messages(), [])
+
+class MessagingTest(unittest.TestCase):
+    """Contacts, per-recipient inbox reads and delta polling"""
+
+    def setUp(self):
+        self.server = MockServer()
+        self.alice = MockClient("alice")
+        self.bob = MockClient("bob")
+        self.server.register_clients([("alice", self.alice.ed25519_key), ("bob", self.bob.ed25519_key)])
+        self.alice.add_contact("bob", self.bob.x25519_key)
+        self.bob.add_contact("alice", self.alice.x25519_key)
+
+    def test_receive_returns_only_new_messages(self):
+        self.alice.send_message(self.server, "bob", "first")
+        self.alice.send_message(self.server, "bob", "second")
+        received = self.bob.receive_messages(self.server)
+        self.assertEqual([msg["decrypted_content"] for msg in received], ["first", "second"])
+        self.assertEqual(self.bob.receive_messages(self.server), [])
+
+        self.alice.send_message(self.server, "bob", "third")
+        received = self.bob.receive_messages(self.server)
+        self.assertEqual([msg["decrypted_content"] for msg in received], ["third"])
+        self.assertEqual(self.bob.receive_messages(self.server), [])
+
+    def test_invalid_contact_key_adds_no_contact(self):
+        for bad_key in ["nothex", "00" * 32]:
+            with self.assertRaises(ValueError):
+                self.alice.add_contact("carol", bad_key)
+            self.assertNotIn("carol", self.alice.contacts)
+            with self.assertRaises(ValueError):
+                self.alice.send_message(self.server, "carol", "hi")
+
+    def test_get_messages_for_client_returns_a_copy(self):
+        self.alice.send_message(self.server, "bob", "first")
+        self.server.get_messages_for_client("bob").pop()
+        self.assertEqual(len(self.server.get_messages_for_client("bob")), 1)
+        received = self.bob.receive_messages(self.server)
+        self.assertEqual([msg["decrypted_content"] for msg in received], ["first"])
+
+class MessageLogTest(unittest.TestCase):
+    """Write a message log, replay it, and compare with what was stored"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp.name
+        self.log_path = os.path.join(self.data_dir, "server_messages.ndjson")
+
+        self.alice = MockClient("alice")
+        self.bob = MockClient("bob")
+        self.alice.add_contact("bob", self.bob.x25519_key)
+        self.bob.add_contact("alice", self.alice.x25519_key)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _run_server(self, fresh_log: bool, texts) -> MockServer:
+        server = MockServer(self.data_dir, fresh_log=fresh_log)
+        server.register_clients([("alice", self.alice.ed25519_key), ("bob", self.bob.ed25519_key)])
+        for text in texts:
+            self.alice.send_message(server, "bob", text)
+        server.close()
+        return server
+
+    def test_replay_restores_messages(self):
+        server = self._run_server(True, ["first", "second"])
+
+        replayed = MockServer()
+        replayed.replay_log(self.log_path)
+
+        self.assertEqual(replayed.get_all_messages(), server.get_all_messages())
+        self.assertEqual(replayed.get_messages_for_client("bob"), server.get_messages_for_client("bob"))
+        self.assertEqual(
+            [self.bob.decrypt(msg.content, msg.sender_id) for msg in replayed.get_all_messages()],
+            ["first", "second"]
+        )
+
+    def test_replay_skips_torn_final_record(self):
+        server = self._run_server(True, ["first", "second"])
+        with open(self.log_path, "ab") as f:
+            f.write(b'{"id":"alice-3","sender_id":"ali')
+
+        replayed = MockServer()
+        replayed.replay_log(self.log_path)
+        self.assertEqual(replayed.get_all_messages(), server.get_all_messages())
+
+    def test_read_message_log_streams_in_order(self):
+        server = self._run_server(True, ["one", "two", "three"])
+        self.assertEqual(list(read_message_log(self.log_path)), server.get_all_messages())
+
+    def test_fresh_log_truncates_previous_run(self):
+        self._run_server(True, ["old"])
+        server = self._run_server(True, ["new"])
+        self.assertEqual(list(read_message_log(self.log_path)), server.get_all_messages())
+
+    def test_log_appends_by_default(self):
+        first = self._run_server(True, ["old"])
+        second = self._run_server(False, ["new"])
+        self.assertEqual(
+            list(read_message_log(self.log_path)),
+            first.get_all_messages() + second.get_all_messages()
+        )
+
+if __name__ == "__main__":
+    unittest.main()